@@ -1,31 +1,230 @@
 import logging
 import httpx
 import asyncio
-from typing import Dict, List, Optional, Tuple
+import msgspec
+import orjson
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
 from ..config import settings
 from ..models import SyncItem
+from .retry import call_with_retries
+from .throttle import TokenBucket
 
 logger = logging.getLogger(__name__)
 
+# An ASIN identifies at most a handful of items, so keep search payloads small
+LIBRARY_SEARCH_LIMIT = 5
+
+# Max item IDs per /api/items/batch/get request
+ITEM_BATCH_SIZE = 100
+
+# Delay before writing the item cache, so a burst of lookups results in a single write
+ITEM_CACHE_SAVE_DELAY_SECONDS = 5
+
+# Typed wire schemas for ABS payloads. Only the fields we read are declared;
+# msgspec skips everything else without materializing it. The schemas never form
+# reference cycles, so gc=False keeps large /api/me payloads out of the cyclic GC.
+class MetadataWire(msgspec.Struct, gc=False):
+    asin: Optional[str] = None
+
+class MediaWire(msgspec.Struct, gc=False):
+    id: Optional[str] = None
+    duration: Optional[float] = None
+    metadata: Optional[MetadataWire] = None
+
+class LibraryItemWire(msgspec.Struct, gc=False):
+    id: Optional[str] = None
+    media: Optional[MediaWire] = None
+
+    @property
+    def asin(self) -> Optional[str]:
+        if self.media and self.media.metadata:
+            return self.media.metadata.asin
+        return None
+
+class MediaProgressWire(msgspec.Struct, gc=False):
+    libraryItemId: Optional[str] = None
+    currentTime: Optional[float] = None
+    duration: Optional[float] = None
+    lastUpdate: Optional[float] = None  # ms timestamp
+    media: Optional[MediaWire] = None
+
+    @property
+    def asin(self) -> Optional[str]:
+        if self.media and self.media.metadata:
+            return self.media.metadata.asin
+        return None
+
+class UserWire(msgspec.Struct, gc=False):
+    id: Optional[str] = None
+    mediaProgress: List[MediaProgressWire] = []
+
+class MeWire(UserWire):
+    # Usually wrapped in 'user' object or at root depending on version
+    user: Optional[UserWire] = None
+
+class BatchItemsWire(msgspec.Struct, gc=False):
+    libraryItems: List[LibraryItemWire] = []
+
+class LibraryWire(msgspec.Struct, gc=False):
+    id: str
+
+class LibrariesWire(msgspec.Struct, gc=False):
+    libraries: List[LibraryWire] = []
+
+# Decoders are built once per response shape and reused for every request.
+# Search results vary too much in shape and keep going through _json().
+_ME_DECODER = msgspec.json.Decoder(MeWire)
+_ITEM_DECODER = msgspec.json.Decoder(LibraryItemWire)
+_BATCH_ITEMS_DECODER = msgspec.json.Decoder(BatchItemsWire)
+_LIBRARIES_DECODER = msgspec.json.Decoder(LibrariesWire)
+
+def _json(resp: httpx.Response):
+    """Decode a JSON response body straight from bytes."""
+    return orjson.loads(resp.content)
+
 class ABSClient:
     def __init__(self):
         self.client = httpx.AsyncClient(
             base_url=settings.ABS_BASE_URL.rstrip('/'),
             headers={"Authorization": f"Bearer {settings.ABS_TOKEN}"},
-            timeout=settings.REQUEST_TIMEOUT_SECONDS
+            timeout=settings.REQUEST_TIMEOUT_SECONDS,
+            # All traffic goes to a single host: multiplex over HTTP/2 where the
+            # server supports it and keep connections warm between sync cycles.
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=settings.ABS_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.ABS_HTTP_MAX_CONNECTIONS // 2,
+                keepalive_expiry=60.0
+            )
         )
         self.user_id: Optional[str] = settings.ABS_USER_ID
         self.asin_map: Dict[str, str] = {}  # asin -> item_id
         self.item_map: Dict[str, str] = {}  # item_id -> asin
         self.libraries: List[str] = []
 
+        # Persistent sidecar for the maps above, stored next to the state file
+        self.cache_path = Path(settings.STATE_PATH).with_name("abs_item_cache.json")
+        # Negative cache kept apart from item_map: item_id -> when lookup found no ASIN
+        self._no_asin_ids: Dict[str, float] = {}
+        # Items confirmed to exist this process; a progress 404 for them just means "not started"
+        self._existing_ids: Set[str] = set()
+        self._cache_save_task: Optional[asyncio.Task] = None
+        # Caps the aggregate rate of progress writes
+        self._write_bucket = TokenBucket(settings.WRITE_RATE_LIMIT_PER_SECOND, settings.WRITE_RATE_LIMIT_BURST)
+
+        # Last decoded /api/me response and when it was fetched (monotonic)
+        self._me_cache: Optional[Tuple[float, MeWire]] = None
+        # path -> (ETag, decoded body) for conditional GETs
+        self._etag_cache: Dict[str, Tuple[str, Any]] = {}
+
+    def _load_item_cache(self):
+        if not settings.PERSIST_ENABLED or not self.cache_path.exists():
+            return
+
+        try:
+            data = orjson.loads(self.cache_path.read_bytes())
+            now = time.time()
+            self.asin_map.update(data.get("asin_map", {}))
+            self.item_map.update(data.get("item_map", {}))
+            # Negative entries expire so items that gain an ASIN later are retried
+            for item_id, checked_at in data.get("missing", {}).items():
+                if now - checked_at < settings.ABS_ASIN_MISS_TTL_SECONDS:
+                    self._no_asin_ids[item_id] = checked_at
+            logger.info(f"Loaded {len(self.asin_map)} cached ASIN mappings from {self.cache_path}")
+        except Exception as e:
+            logger.warning(f"Failed to load ABS item cache: {e}. Starting empty.")
+
+    def _save_item_cache(self):
+        payload = {
+            "asin_map": self.asin_map,
+            "item_map": self.item_map,
+            "missing": self._no_asin_ids,
+        }
+        tmp_path = self.cache_path.with_suffix('.tmp')
+        try:
+            tmp_path.write_bytes(orjson.dumps(payload))
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.error(f"Failed to save ABS item cache to {self.cache_path}: {e}")
+
+    async def _save_item_cache_later(self):
+        await asyncio.sleep(ITEM_CACHE_SAVE_DELAY_SECONDS)
+        self._cache_save_task = None
+        self._save_item_cache()
+
+    def _schedule_item_cache_save(self):
+        """Debounced write of the ASIN maps; repeated calls coalesce into one save."""
+        if not settings.PERSIST_ENABLED or self._cache_save_task is not None:
+            return
+        self._cache_save_task = asyncio.create_task(self._save_item_cache_later())
+
+    def flush_item_cache(self):
+        """Write a pending debounced save now (e.g. on shutdown)."""
+        if self._cache_save_task is None:
+            return
+        self._cache_save_task.cancel()
+        self._cache_save_task = None
+        self._save_item_cache()
+
+    def _forget_item(self, item_id: str):
+        """Drop cached mappings for an item that no longer exists on the server."""
+        mapped_asin = self.item_map.pop(item_id, None)
+        # Search and progress lookups only fill asin_map, so look there by value too
+        asins = [asin for asin, mapped_id in self.asin_map.items() if mapped_id == item_id]
+        for asin in asins:
+            del self.asin_map[asin]
+        self._no_asin_ids.pop(item_id, None)
+        self._existing_ids.discard(item_id)
+        if mapped_asin or asins:
+            logger.info(f"ABS item {item_id} ({', '.join(asins)}) no longer exists, dropped cached mapping")
+            self._schedule_item_cache_save()
+
+    def _is_item_cached(self, item_id: str) -> bool:
+        if item_id in self.item_map:
+            return True
+        checked_at = self._no_asin_ids.get(item_id)
+        return checked_at is not None and time.time() - checked_at < settings.ABS_ASIN_MISS_TTL_SECONDS
+
+    async def _conditional_get(self, path: str, decoder: msgspec.json.Decoder) -> Any:
+        """
+        GET with If-None-Match when we hold an ETag for the path.
+        A 304 reuses the previously decoded body instead of downloading and parsing it again.
+        """
+        cached = self._etag_cache.get(path)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        resp = await self.client.get(path, headers=headers)
+        if resp.status_code == 304 and cached:
+            return cached[1]
+
+        resp.raise_for_status()
+        decoded = decoder.decode(resp.content)
+        etag = resp.headers.get("ETag")
+        if etag:
+            self._etag_cache[path] = (etag, decoded)
+        return decoded
+
+    async def _get_me(self) -> MeWire:
+        """
+        GET /api/me. A response fetched within the last half sync interval is reused,
+        which lets the first sync cycle share the request made by initialize().
+        """
+        now = time.monotonic()
+        if self._me_cache and now - self._me_cache[0] < settings.SYNC_INTERVAL_SECONDS / 2:
+            return self._me_cache[1]
+
+        me = await self._conditional_get("/api/me", _ME_DECODER)
+        self._me_cache = (now, me)
+        return me
+
     async def initialize(self):
+        self._load_item_cache()
         try:
             if not self.user_id:
-                resp = await self.client.get("/api/me")
-                resp.raise_for_status()
-                data = resp.json()
-                self.user_id = data.get("user", {}).get("id") or data.get("id")
+                me = await self._get_me()
+                self.user_id = (me.user and me.user.id) or me.id
                 if not self.user_id:
                     raise ValueError("Could not determine User ID")
                 logger.info(f"Connected to ABS as user {self.user_id}")
@@ -41,14 +240,49 @@ class ABSClient:
         try:
             resp = await self.client.get(f"/api/items/{item_id}")
             if resp.status_code == 200:
-                data = resp.json()
-                media = data.get("media", {})
-                metadata = media.get("metadata", {})
-                return metadata.get("asin")
+                self._existing_ids.add(item_id)
+                return _ITEM_DECODER.decode(resp.content).asin
+            if resp.status_code == 404:
+                self._forget_item(item_id)
         except Exception:
             pass
         return None
 
+    async def _item_exists(self, item_id: str) -> bool:
+        """
+        False only if ABS says the item is gone; errors count as existing.
+        A confirmed item is remembered, so this costs at most one request per item per process.
+        """
+        if item_id in self._existing_ids:
+            return True
+        try:
+            resp = await self.client.get(f"/api/items/{item_id}")
+        except Exception:
+            return True
+        if resp.status_code == 404:
+            return False
+        if resp.status_code == 200:
+            self._existing_ids.add(item_id)
+        return True
+
+    async def get_library_items_asins(self, item_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Resolve ASINs for many items with ABS' batch endpoint, one request per ITEM_BATCH_SIZE IDs.
+        Returns item_id -> asin (None if the item has no ASIN) for every item the server returned.
+        """
+        found: Dict[str, Optional[str]] = {}
+        for i in range(0, len(item_ids), ITEM_BATCH_SIZE):
+            chunk = item_ids[i:i + ITEM_BATCH_SIZE]
+            try:
+                resp = await self.client.post("/api/items/batch/get", json={"libraryItemIds": chunk})
+                resp.raise_for_status()
+                for item in _BATCH_ITEMS_DECODER.decode(resp.content).libraryItems:
+                    if item.id:
+                        found[item.id] = item.asin
+            except Exception as e:
+                logger.debug(f"Batch item lookup failed, falling back to per-item lookups: {e}")
+        return found
+
     async def get_in_progress(self) -> Dict[str, SyncItem]:
         """
         Returns map of ASIN -> SyncItem (with abs_pos filled).
@@ -57,54 +291,62 @@ class ABSClient:
         results = {}
         try:
             # Use /api/me which should be accessible and contain user data
-            resp = await self.client.get("/api/me")
-            resp.raise_for_status()
-            data = resp.json()
-            # Usually wrapped in 'user' object or at root depending on version
-            user_data = data.get("user", data)
-            items = user_data.get("mediaProgress", [])
+            me = await self._get_me()
+            items = (me.user or me).mediaProgress
             
             # 1. Identify missing ASINs
+            # Each entry is parsed once here and reused when building results below.
             unknown_ids = []
+            preparsed: List[Tuple[Optional[str], Optional[str], MediaProgressWire]] = []
             for prog in items:
                 # Direct check
-                media = prog.get("media", {})
-                metadata = media.get("metadata", {})
-                asin = metadata.get("asin")
-                item_id = prog.get("libraryItemId")
+                asin = prog.asin
+                media = prog.media
+                item_id = prog.libraryItemId or (media.id if media else None)
+                preparsed.append((asin, item_id, prog))
                 
                 if not asin and item_id:
-                    if item_id in self.item_map:
+                    if self._is_item_cached(item_id):
                         # Already cached
                         pass
                     else:
                         unknown_ids.append(item_id)
             
-            # 2. Fetch unknown in parallel chunks
+            # 2. Fetch unknown in one batch request
             if unknown_ids:
                 logger.info(f"Fetching ASINs for {len(unknown_ids)} ABS items...")
-                chunk_size = 10
-                for i in range(0, len(unknown_ids), chunk_size):
-                    chunk = unknown_ids[i:i+chunk_size]
-                    tasks = [self.get_library_item_asin(uid) for uid in chunk]
-                    results_asins = await asyncio.gather(*tasks)
-                    
-                    for uid, found_asin in zip(chunk, results_asins):
-                        if found_asin:
-                            self.item_map[uid] = found_asin
-                            self.asin_map[found_asin] = uid
-                        else:
-                            # Cache as empty to avoid refetching
-                            self.item_map[uid] = ""
+                found = await self.get_library_items_asins(unknown_ids)
+
+                # Fall back to per-item lookups for anything the batch call didn't return,
+                # in parallel bounded by a semaphore.
+                # The task group cancels outstanding lookups if this task is cancelled.
+                remaining = [uid for uid in unknown_ids if uid not in found]
+                if remaining:
+                    sem = asyncio.Semaphore(settings.ABS_LOOKUP_CONCURRENCY)
+
+                    async def _bounded(uid: str) -> Optional[str]:
+                        async with sem:
+                            return await self.get_library_item_asin(uid)
+
+                    async with asyncio.TaskGroup() as tg:
+                        tasks = [tg.create_task(_bounded(uid)) for uid in remaining]
+                    for uid, task in zip(remaining, tasks):
+                        found[uid] = task.result()
+
+                now = time.time()
+                for uid in unknown_ids:
+                    found_asin = found.get(uid)
+                    if found_asin:
+                        self.item_map[uid] = found_asin
+                        self.asin_map[found_asin] = uid
+                        self._no_asin_ids.pop(uid, None)
+                    else:
+                        # Remember the miss to avoid refetching
+                        self._no_asin_ids[uid] = now
+                self._schedule_item_cache_save()
 
             # 3. Process items
-            for prog in items:
-                media = prog.get("media", {})
-                metadata = media.get("metadata", {})
-                asin = metadata.get("asin")
-                
-                item_id = prog.get("libraryItemId") or media.get("id")
-                
+            for asin, item_id, prog in preparsed:
                 # Fallback to cache
                 if not asin and item_id:
                     asin = self.item_map.get(item_id)
@@ -112,18 +354,19 @@ class ABSClient:
                 if not asin:
                     continue
 
-                if item_id:
+                if item_id and self.asin_map.get(asin) != item_id:
                     self.asin_map[asin] = item_id
+                    self._schedule_item_cache_save()
                 
-                current_time = prog.get("currentTime")
-                duration = prog.get("duration") # or media.duration
-                last_update = prog.get("lastUpdate") # ms timestamp
+                current_time = prog.currentTime
+                duration = prog.duration or (prog.media.duration if prog.media else None)
+                last_update = prog.lastUpdate # ms timestamp
 
                 if current_time is not None:
                     results[asin] = SyncItem(
                         asin=asin,
                         abs_pos_s=current_time,
-                        duration_s=duration or media.get("duration"),
+                        duration_s=duration,
                         abs_item_id=item_id,
                         abs_updated_at=last_update / 1000.0 if last_update else 0
                     )
@@ -132,10 +375,14 @@ class ABSClient:
         
         return results
 
-    async def update_progress(self, item_id: str, position_s: float):
+    async def update_progress(self, item_id: str, position_s: float) -> Optional[bool]:
+        """
+        Push progress to ABS. Returns True if the update was applied, False if it
+        failed, or None if it was skipped (dry run).
+        """
         if settings.DRY_RUN:
             logger.info(f"[DRY RUN] Would update ABS item {item_id} to {position_s}s")
-            return
+            return None
 
         try:
             # /api/me/progress/{itemId}
@@ -144,23 +391,43 @@ class ABSClient:
                 "currentTime": position_s,
                 "isFinished": False # Logic to detect finish handled by caller if needed
             }
-            resp = await self.client.patch(f"/api/me/progress/{item_id}", json=payload)
-            resp.raise_for_status()
+            async def _patch():
+                resp = await self.client.patch(f"/api/me/progress/{item_id}", json=payload)
+                resp.raise_for_status()
+
+            await self._write_bucket.acquire()
+            await call_with_retries(_patch)
+            # Cached progress no longer reflects the server
+            self._me_cache = None
             logger.info(f"Updated ABS item {item_id} to {position_s}s")
+            return True
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                self._forget_item(item_id)
+            logger.error(f"Failed to update ABS progress for {item_id}: {e}")
+            return False
         except Exception as e:
             logger.error(f"Failed to update ABS progress for {item_id}: {e}")
+            return False
 
     async def get_item_progress(self, item_id: str) -> Optional[Dict]:
         """
         Fetch progress for a specific item.
-        Returns dict with currentTime, duration, lastUpdate, etc.
+        Returns dict with currentTime, duration, lastUpdate, etc., an empty dict if
+        the item has no progress yet, or None if it is unavailable (request failed,
+        or the item was deleted, in which case its cached mapping is dropped).
         """
         try:
             resp = await self.client.get(f"/api/me/progress/{item_id}")
             if resp.status_code == 404:
+                # No progress recorded yet, unless the item itself is gone
+                if await self._item_exists(item_id):
+                    return {}
+                self._forget_item(item_id)
                 return None
             resp.raise_for_status()
-            return resp.json()
+            self._existing_ids.add(item_id)
+            return _json(resp)
         except Exception as e:
             logger.error(f"Failed to fetch progress for {item_id}: {e}")
             return None
@@ -175,10 +442,8 @@ class ABSClient:
         if self.libraries:
             return self.libraries
         try:
-            resp = await self.client.get("/api/libraries")
-            resp.raise_for_status()
-            data = resp.json()
-            all_libs = [lib["id"] for lib in data.get("libraries", [])]
+            libraries = await self._conditional_get("/api/libraries", _LIBRARIES_DECODER)
+            all_libs = [lib.id for lib in libraries.libraries]
             
             if settings.ABS_LIBRARY_ID:
                 if settings.ABS_LIBRARY_ID in all_libs:
@@ -194,48 +459,71 @@ class ABSClient:
             logger.error(f"Failed to fetch libraries: {e}")
         return self.libraries
 
+    async def _search_library(self, lib_id: str, asin: str) -> Optional[str]:
+        """
+        Search a single library for an item whose metadata ASIN matches exactly.
+        Returns the item ID or None.
+        """
+        try:
+            # Library search
+            resp = await self.client.get(
+                f"/api/libraries/{lib_id}/search",
+                params={"q": asin, "limit": LIBRARY_SEARCH_LIMIT}
+            )
+            resp.raise_for_status()
+            data = _json(resp)
+
+            # Results usually in 'book', 'audiobooks' or 'results'
+            candidates = []
+            if isinstance(data, list):
+                candidates = data
+            else:
+                candidates.extend(data.get("book", []))
+                candidates.extend(data.get("audiobooks", []))
+                candidates.extend(data.get("results", []))
+
+            for item in candidates:
+                # Search results might wrap item in 'libraryItem'
+                real_item = item.get("libraryItem", item)
+
+                # Check metadata
+                media = real_item.get("media", {})
+                metadata = media.get("metadata", {})
+
+                # Loose check on ASIN
+                if metadata.get("asin") == asin:
+                    item_id = real_item.get("id")
+                    if item_id:
+                        return item_id
+
+        except Exception as e:
+            logger.debug(f"Failed to search lib {lib_id} for {asin}: {e}")
+        return None
+
     async def lookup_abs_item(self, asin: str) -> Optional[str]:
         """
         Look up ABS Item ID by ASIN using library search. Caches result.
+        All libraries are searched concurrently; the first match wins.
         """
         if asin in self.asin_map:
             return self.asin_map[asin]
-            
+
         libraries = await self.get_libraries()
-        
-        for lib_id in libraries:
-            try:
-                # Library search
-                resp = await self.client.get(f"/api/libraries/{lib_id}/search", params={"q": asin})
-                resp.raise_for_status()
-                data = resp.json()
-                
-                # Results usually in 'book', 'audiobooks' or 'results'
-                candidates = []
-                if isinstance(data, list):
-                    candidates = data
-                else:
-                    candidates.extend(data.get("book", []))
-                    candidates.extend(data.get("audiobooks", []))
-                    candidates.extend(data.get("results", []))
-                
-                for item in candidates:
-                    # Search results might wrap item in 'libraryItem'
-                    real_item = item.get("libraryItem", item)
-                    
-                    # Check metadata
-                    media = real_item.get("media", {})
-                    metadata = media.get("metadata", {})
-                    
-                    # Loose check on ASIN
-                    if metadata.get("asin") == asin:
-                        item_id = real_item.get("id")
-                        if item_id:
-                            self.asin_map[asin] = item_id
-                            logger.debug(f"Resolved ASIN {asin} to ABS Item {item_id}")
-                            return item_id
-                            
-            except Exception as e:
-                logger.debug(f"Failed to search lib {lib_id} for {asin}: {e}")
-            
+        if not libraries:
+            return None
+
+        tasks = [asyncio.create_task(self._search_library(lib_id, asin)) for lib_id in libraries]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item_id = await next_done
+                if item_id:
+                    self.asin_map[asin] = item_id
+                    self._schedule_item_cache_save()
+                    logger.debug(f"Resolved ASIN {asin} to ABS Item {item_id}")
+                    return item_id
+        finally:
+            # Stop searching the remaining libraries once we have an answer
+            for task in tasks:
+                task.cancel()
+
         return None
@@ -1,16 +1,28 @@
 import logging
-import audible
 import asyncio
 import os
-from typing import List, Dict, Optional
+import time
+from collections import deque
+from typing import TYPE_CHECKING, List, Dict, Optional
 from ..config import settings
+from .retry import call_with_retries
+from .throttle import TokenBucket
+
+if TYPE_CHECKING:
+    import audible
 
 logger = logging.getLogger(__name__)
 
+# Circuit breaker for library size during deep scans
+DEEP_SCAN_MAX_PAGES = 20
+
 class AudibleClient:
     def __init__(self):
-        self.client: Optional[audible.AsyncClient] = None
+        self.auth: Optional["audible.Authenticator"] = None
+        self.client: Optional["audible.AsyncClient"] = None
         self._auth_ready = False
+        # Caps the aggregate rate of position writes
+        self._write_bucket = TokenBucket(settings.WRITE_RATE_LIMIT_PER_SECOND, settings.WRITE_RATE_LIMIT_BURST)
 
     async def initialize(self):
         if not os.path.exists(settings.AUDIBLE_AUTH_JSON_PATH):
@@ -18,8 +30,14 @@ class AudibleClient:
             return
 
         try:
-            auth = audible.Authenticator.from_file(settings.AUDIBLE_AUTH_JSON_PATH)
-            self.client = audible.AsyncClient(auth=auth)
+            # Imported lazily: audible pulls in heavy dependencies (crypto, HTTP stack)
+            # that are not needed when no Audible session is configured.
+            import audible
+
+            # Parsed once and reused for the lifetime of the client
+            if self.auth is None:
+                self.auth = audible.Authenticator.from_file(settings.AUDIBLE_AUTH_JSON_PATH)
+            self.client = audible.AsyncClient(auth=self.auth)
             # Verify auth
             await self.client.get("1.0/library", params={"num_results": 1})
             self._auth_ready = True
@@ -28,44 +46,59 @@ class AudibleClient:
             logger.error(f"Failed to initialize Audible client: {e}")
             self._auth_ready = False
 
+    async def _fetch_positions_batch(self, batch: List[str]) -> Dict[str, int]:
+        """Fetch last positions for a single batch of ASINs. Returns dict of asin -> position_ms"""
+        results = {}
+        try:
+            data = await self.client.get(
+                "1.0/annotations/lastpositions",
+                params={"asins": ",".join(batch)}
+            )
+
+            # Handle different response formats
+            if "last_positions" in data:
+                for pos in data["last_positions"]:
+                    results[pos["asin"]] = pos["position_ms"]
+            elif "asin_last_position_heard_annots" in data:
+                for item in data["asin_last_position_heard_annots"]:
+                    asin = item["asin"]
+                    pos_ms = item.get("last_position_heard", {}).get("position_ms")
+                    if pos_ms is not None:
+                        results[asin] = pos_ms
+
+        except Exception as e:
+            # Don't fail completely, just skip this batch
+            logger.error(f"Error fetching Audible positions for batch: {e}")
+        return results
+
     async def get_last_positions(self, asins: List[str]) -> Dict[str, int]:
         """Returns dict of asin -> position_ms"""
         if not self._auth_ready or not asins:
             return {}
 
+        # Batch requests, fetched concurrently but capped to stay within Audible rate limits
+        size = settings.AUDIBLE_BATCH_SIZE
+        batches = [asins[i : i + size] for i in range(0, len(asins), size)]
+        sem = asyncio.Semaphore(settings.AUDIBLE_MAX_CONCURRENCY)
+
+        async def _bounded(batch: List[str]) -> Dict[str, int]:
+            async with sem:
+                return await self._fetch_positions_batch(batch)
+
         results = {}
-        # Batch requests
-        for i in range(0, len(asins), settings.AUDIBLE_BATCH_SIZE):
-            batch = asins[i : i + settings.AUDIBLE_BATCH_SIZE]
-            asins_str = ",".join(batch)
-            try:
-                data = await self.client.get(
-                    "1.0/annotations/lastpositions",
-                    params={"asins": asins_str}
-                )
-                
-                # Handle different response formats
-                if "last_positions" in data:
-                    for pos in data["last_positions"]:
-                        results[pos["asin"]] = pos["position_ms"]
-                elif "asin_last_position_heard_annots" in data:
-                    for item in data["asin_last_position_heard_annots"]:
-                        asin = item["asin"]
-                        pos_ms = item.get("last_position_heard", {}).get("position_ms")
-                        if pos_ms is not None:
-                            results[asin] = pos_ms
-                            
-            except Exception as e:
-                logger.error(f"Error fetching Audible positions for batch: {e}")
-                # Don't fail completely, just skip this batch
-                continue
+        for batch_result in await asyncio.gather(*[_bounded(b) for b in batches]):
+            results.update(batch_result)
         return results
 
-    async def update_position(self, asin: str, position_ms: int):
+    async def update_position(self, asin: str, position_ms: int) -> Optional[bool]:
+        """
+        Push a position to Audible. Returns True if the update was applied, False if it
+        failed, or None if it was skipped (dry run or not authenticated).
+        """
         if not self._auth_ready or settings.DRY_RUN:
             if settings.DRY_RUN:
                 logger.info(f"[DRY RUN] Would update Audible {asin} to {position_ms}ms")
-            return
+            return None
 
         try:
             # The PUT endpoint for lastpositions might vary by library version,
@@ -76,13 +109,16 @@ class AudibleClient:
                 "asin": asin,
                 "acr": asin,
                 "position_ms": position_ms,
-                "timestamp": int(asyncio.get_event_loop().time() * 1000) # Client timestamp
+                "timestamp": int(time.time() * 1000) # Client wall-clock timestamp (ms)
             }
             # audible.AsyncClient.put expects (path, body, ...)
-            await self.client.put(f"1.0/lastpositions/{asin}", payload)
+            await self._write_bucket.acquire()
+            await call_with_retries(lambda: self.client.put(f"1.0/lastpositions/{asin}", payload))
             logger.info(f"Updated Audible {asin} to {position_ms}ms")
+            return True
         except Exception as e:
             logger.error(f"Failed to update Audible position for {asin}: {e}")
+            return False
 
     async def get_newly_purchased(self, after_timestamp: float) -> List[str]:
         if not self._auth_ready:
@@ -132,24 +168,41 @@ class AudibleClient:
             logger.error(f"Failed to fetch recently played from Audible: {e}")
             return []
 
+    async def _fetch_library_page(self, page: int) -> List[Dict]:
+        data = await self.client.get(
+            "1.0/library",
+            params={
+                "num_results": 50,
+                "page": page,
+                "response_groups": "product_attrs,media,percent_complete"
+            }
+        )
+        return data.get("items", [])
+
     async def deep_scan_progress(self) -> List[str]:
-        """Scans for in-progress items."""
+        """
+        Scans for in-progress items.
+        Keeps a window of pages in flight so network latency overlaps with parsing.
+        """
         if not self._auth_ready:
             return []
         
         candidates = []
-        page = 1
+        in_flight = deque()
+        next_page = 1
+
+        def _enqueue_next():
+            nonlocal next_page
+            if next_page <= DEEP_SCAN_MAX_PAGES:
+                in_flight.append(asyncio.create_task(self._fetch_library_page(next_page)))
+                next_page += 1
+
         try:
-            while len(candidates) < settings.DEEP_SCAN_MAX_IN_PROGRESS:
-                data = await self.client.get(
-                    "1.0/library",
-                    params={
-                        "num_results": 50,
-                        "page": page,
-                        "response_groups": "product_attrs,media,percent_complete"
-                    }
-                )
-                items = data.get("items", [])
+            for _ in range(settings.AUDIBLE_MAX_CONCURRENCY):
+                _enqueue_next()
+
+            while in_flight and len(candidates) < settings.DEEP_SCAN_MAX_IN_PROGRESS:
+                items = await in_flight.popleft()
                 if not items:
                     break
                 
@@ -157,12 +210,15 @@ class AudibleClient:
                     pc = item.get("percent_complete")
                     if pc is not None and 0 < pc < 100:
                         candidates.append(item["asin"])
-                
-                page += 1
-                # Circuit breaker for library size
-                if page > 20: 
-                    break
+
+                _enqueue_next()
         except Exception as e:
             logger.error(f"Deep scan failed: {e}")
+        finally:
+            # Drop prefetched pages past the end of the library, and retrieve the
+            # outcome of any that already failed so asyncio doesn't warn about it
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
         
         return candidates
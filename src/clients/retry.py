@@ -0,0 +1,56 @@
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable, Optional, TypeVar
+import httpx
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Upper bound for a server-provided Retry-After, so one write can't stall the sync loop
+MAX_RETRY_AFTER_SECONDS = 60.0
+
+def _status_code(exc: Exception) -> Optional[int]:
+    # httpx.HTTPStatusError and audible StatusError carry the response;
+    # audible NotResponding/NetworkError only expose a synthetic code.
+    response = getattr(exc, "response", None)
+    if response is not None:
+        return response.status_code
+    return getattr(exc, "code", None)
+
+def _is_transient(exc: Exception) -> bool:
+    if isinstance(exc, httpx.TransportError):
+        return True
+    code = _status_code(exc)
+    return code is not None and (code >= 500 or code == 429)
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    try:
+        return min(float(response.headers["Retry-After"]), MAX_RETRY_AFTER_SECONDS)
+    except (KeyError, ValueError):
+        return None
+
+async def call_with_retries(func: Callable[[], Awaitable[T]]) -> T:
+    """
+    Await func(), retrying transient failures (transport errors, 5xx, 429) up to
+    RETRY_MAX_ATTEMPTS times with exponential backoff and jitter.
+    Honors Retry-After when the server sends one. Other errors are raised immediately.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await func()
+        except Exception as e:
+            attempt += 1
+            if attempt >= settings.RETRY_MAX_ATTEMPTS or not _is_transient(e):
+                raise
+            delay = _retry_after(e)
+            if delay is None:
+                delay = 2 ** (attempt - 1) + random.random()
+            logger.warning(f"Transient error ({e}), retrying in {delay:.1f}s (attempt {attempt + 1}/{settings.RETRY_MAX_ATTEMPTS})")
+            await asyncio.sleep(delay)
@@ -0,0 +1,34 @@
+import asyncio
+import time
+
+class TokenBucket:
+    """
+    Async token bucket: allows bursts of up to `burst` calls, refilled at
+    `rate_per_sec` tokens per second. A rate of 0 or less disables throttling.
+    """
+    # Number of acquire() calls that had to wait, across all buckets (exported via /metrics)
+    waits_total = 0
+
+    def __init__(self, rate_per_sec: float, burst: int):
+        self.rate = rate_per_sec
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        # Serialized so waiters are served in order and don't race for the same token
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                TokenBucket.waits_total += 1
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
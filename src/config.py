@@ -9,6 +9,9 @@ class Settings(BaseSettings):
     ABS_USER_ID: Optional[str] = None
     ABS_LIBRARY_ID: Optional[str] = None
     ABS_ALLOW_DUPLICATE_ASIN: bool = False
+    ABS_LOOKUP_CONCURRENCY: int = 10
+    ABS_HTTP_MAX_CONNECTIONS: int = 100
+    ABS_ASIN_MISS_TTL_SECONDS: int = 604800  # 7d
 
     # Audible
     AUDIBLE_LOCALE: str = "us"
@@ -16,22 +19,26 @@ class Settings(BaseSettings):
     AUDIBLE_AUTH_JSON_PATH: str = "/data/audible_session.json"
     AUDIBLE_AUTH_JSON_B64: Optional[str] = None
     AUDIBLE_BATCH_SIZE: int = 20
+    AUDIBLE_MAX_CONCURRENCY: int = 4
     AUDIBLE_LIBRARY_DISCOVERY_INTERVAL_SECONDS: int = 21600  # 6h
     AUDIBLE_DEEP_SCAN_INTERVAL_SECONDS: int = 86400  # 24h
     DEEP_SCAN_MAX_IN_PROGRESS: int = 200
     AUDIBLE_RECENTLY_PLAYED_LIMIT: int = 10
+    AUDIBLE_POSITION_CACHE_TTL_SECONDS: int = 600  # 0 disables
 
     # Persistence
     STATE_PATH: str = "/data/state.json"
     PERSIST_ENABLED: bool = True
+    SAVE_MIN_INTERVAL_SECONDS: int = 60
 
     # Sync Logic
     SYNC_INTERVAL_SECONDS: int = 120
     SYNC_TOLERANCE_SECONDS: int = 5
-    SYNC_COOLDOWN_SECONDS: int = 60
+    SYNC_COOLDOWN_SECONDS: Optional[int] = None  # anti ping-pong only; None = 1.5x SYNC_INTERVAL_SECONDS
     SYNC_CONFLICT_MIN_TIME_DELTA_SECONDS: int = 30
     SYNC_MAX_REWIND_SECONDS: int = 600
     WATCHLIST_MAX_SIZE: int = 500
+    SYNC_MAX_CONCURRENCY: int = 8
     ONE_WAY_MODE: str = "bidirectional"  # bidirectional, audible_to_abs, abs_to_audible
 
     # System
@@ -41,6 +48,9 @@ class Settings(BaseSettings):
     HTTP_SERVER_PORT: int = 8080
     HTTP_SERVER_TOKEN: Optional[str] = None
     REQUEST_TIMEOUT_SECONDS: int = 30
+    RETRY_MAX_ATTEMPTS: int = 3
+    WRITE_RATE_LIMIT_PER_SECOND: float = 1.0  # per service, 0 disables
+    WRITE_RATE_LIMIT_BURST: int = 5
 
     model_config = SettingsConfigDict(
         env_file=".env",
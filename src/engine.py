@@ -7,130 +7,208 @@ from .state import StateManager
 
 logger = logging.getLogger(__name__)
 
+SIDE_AUDIBLE = "audible"
+SIDE_ABS = "abs"
+CONFLICT = "conflict"
+SIDE_NAMES = {SIDE_AUDIBLE: "Audible", SIDE_ABS: "ABS"}
+
+# How long, in sync intervals, an unconfirmed push keeps treating the overwritten value as stale
+ECHO_GUARD_SYNC_INTERVALS = 3
+
+# (audible_changed, abs_changed) -> side whose position wins.
+# CONFLICT means both moved and _resolve_conflict picks the winner.
+RESOLUTION_TABLE = {
+    (False, False): None,
+    (True, False): SIDE_AUDIBLE,
+    (False, True): SIDE_ABS,
+    (True, True): CONFLICT,
+}
+
 class SyncEngine:
     def __init__(self, state_manager: StateManager):
         self.sm = state_manager
 
-    def update_post_sync_state(self, asin: str, pushed_audible_ms: Optional[int] = None, pushed_abs_s: Optional[float] = None):
+    def update_post_sync_state(self, asin: str, pushed_audible_s: Optional[float] = None, pushed_abs_s: Optional[float] = None):
         """
         Updates the last_seen values after a successful push to prevent ping-pong detection in the next loop.
         """
         status = self.sm.get_sync_status(asin)
-        if pushed_audible_ms is not None:
-            status.last_seen_audible_position_ms = pushed_audible_ms
+        now = time.monotonic()
+        # Each push arms the echo guard for that side (see _is_stale_read)
+        if pushed_audible_s is not None:
+            status.audible_position_before_push_s = status.last_seen_audible_position_s
+            status.last_pushed_audible_position_s = pushed_audible_s
+            status.last_pushed_to_audible_at = now
+            status.last_seen_audible_position_s = pushed_audible_s
         if pushed_abs_s is not None:
+            status.abs_position_before_push_s = status.last_seen_abs_position_s
+            status.last_pushed_abs_position_s = pushed_abs_s
+            status.last_pushed_to_abs_at = now
             status.last_seen_abs_position_s = pushed_abs_s
+        status.last_sync_result = "ok"
+        self.sm.mark_dirty()
 
-    def sync_item(self, item: SyncItem, current_audible_ms: Optional[int], current_abs_s: Optional[float]):
+    def record_push_failure(self, asin: str):
         """
-        Determines and returns (update_audible_to_ms, update_abs_to_s).
-        Returns (None, None) if no update needed.
+        Records a failed push. last_seen values are left alone, so the change is
+        picked up again the next time the source side moves.
         """
-        asin = item.asin
         status = self.sm.get_sync_status(asin)
-        now = time.time()
+        status.last_sync_result = "error"
+        status.error_count += 1
+        self.sm.mark_dirty()
 
-        # Inputs
-        audible_pos_s = current_audible_ms / 1000.0 if current_audible_ms is not None else None
-        abs_pos_s = current_abs_s
+    @staticmethod
+    def _is_stale_read(current_s: float, pushed_s: Optional[float], before_push_s: Optional[float], pushed_at: float, now: float, tolerance: float) -> bool:
+        """
+        True if a side still reports the value our last push overwrote (e.g. Audible's
+        lastpositions lagging behind a PUT). Only while the push is unconfirmed and
+        younger than ECHO_GUARD_SYNC_INTERVALS sync intervals.
+        """
+        if pushed_s is None or before_push_s is None:
+            return False
+        if now - pushed_at >= settings.SYNC_INTERVAL_SECONDS * ECHO_GUARD_SYNC_INTERVALS:
+            return False
+        return abs(current_s - pushed_s) > tolerance and abs(current_s - before_push_s) <= tolerance
+
+    def detect_changes(self, item: SyncItem, status: SyncStatus, current_audible_s: Optional[float], current_abs_s: Optional[float], now: float) -> Tuple[bool, bool]:
+        """
+        Compares current positions against the last seen ones and records any change on the status.
+        Returns (audible_changed, abs_changed).
+        """
+        asin = item.asin
+        tolerance = settings.SYNC_TOLERANCE_SECONDS
 
-        # 1. Detect Changes
         audible_changed = False
-        if audible_pos_s is not None:
-            delta = abs(audible_pos_s - (status.last_seen_audible_position_ms / 1000.0))
-            if delta > settings.SYNC_TOLERANCE_SECONDS:
-                audible_changed = True
-                logger.info(f"Change detected on Audible for {asin}: {status.last_seen_audible_position_ms/1000.0:.1f}s -> {audible_pos_s:.1f}s")
-                status.last_change_detected_audible_at = now
-                status.last_seen_audible_position_ms = current_audible_ms
+        if current_audible_s is not None:
+            if self._is_stale_read(current_audible_s, status.last_pushed_audible_position_s, status.audible_position_before_push_s,
+                                   status.last_pushed_to_audible_at, now, tolerance):
+                logger.debug("Ignoring stale Audible read for %s: still %.1fs from before our push", asin, current_audible_s)
+            else:
+                if status.last_pushed_audible_position_s is not None:
+                    # Push confirmed, guard expired, or a real change since: disarm
+                    status.last_pushed_audible_position_s = None
+                    status.audible_position_before_push_s = None
+                    self.sm.mark_dirty()
+                delta = abs(current_audible_s - status.last_seen_audible_position_s)
+                if delta > tolerance:
+                    audible_changed = True
+                    logger.info("Change detected on Audible for %s: %.1fs -> %.1fs", asin, status.last_seen_audible_position_s, current_audible_s)
+                    status.last_change_detected_audible_at = now
+                    status.last_seen_audible_position_s = current_audible_s
 
         abs_changed = False
-        if abs_pos_s is not None:
-            delta = abs(abs_pos_s - status.last_seen_abs_position_s)
-            if delta > settings.SYNC_TOLERANCE_SECONDS:
-                abs_changed = True
-                logger.info(f"Change detected on ABS for {asin}: {status.last_seen_abs_position_s:.1f}s -> {abs_pos_s:.1f}s")
-                status.last_change_detected_abs_at = item.abs_updated_at or now
-                status.last_seen_abs_position_s = abs_pos_s
+        if current_abs_s is not None:
+            if self._is_stale_read(current_abs_s, status.last_pushed_abs_position_s, status.abs_position_before_push_s,
+                                   status.last_pushed_to_abs_at, now, tolerance):
+                logger.debug("Ignoring stale ABS read for %s: still %.1fs from before our push", asin, current_abs_s)
+            else:
+                if status.last_pushed_abs_position_s is not None:
+                    status.last_pushed_abs_position_s = None
+                    status.abs_position_before_push_s = None
+                    self.sm.mark_dirty()
+                delta = abs(current_abs_s - status.last_seen_abs_position_s)
+                if delta > tolerance:
+                    abs_changed = True
+                    logger.info("Change detected on ABS for %s: %.1fs -> %.1fs", asin, status.last_seen_abs_position_s, current_abs_s)
+                    if item.abs_updated_at:
+                        # ABS reports a wall-clock time; translate it onto the monotonic clock
+                        status.last_change_detected_abs_at = now - (time.time() - item.abs_updated_at)
+                    else:
+                        status.last_change_detected_abs_at = now
+                    status.last_seen_abs_position_s = current_abs_s
+
+        return audible_changed, abs_changed
 
+    def _resolve_conflict(self, asin: str, status: SyncStatus, audible_pos_s: float, abs_pos_s: float, conflict_min_delta: float) -> str:
+        """
+        Both sides moved since the last sync. If the detected change times differ
+        significantly the newer one wins, otherwise the furthest position does.
+        """
+        time_diff = status.last_change_detected_audible_at - status.last_change_detected_abs_at
+        if abs(time_diff) >= conflict_min_delta:
+            winner = SIDE_AUDIBLE if time_diff > 0 else SIDE_ABS
+            reason = "is newer"
+        else:
+            # Timestamps close: we don't track 'max_reached', so assume further is better
+            winner = SIDE_AUDIBLE if audible_pos_s > abs_pos_s else SIDE_ABS
+            reason = "is further ahead"
+        logger.info("Resolving conflict for %s: %s %s (changes %.1fs apart)", asin, SIDE_NAMES[winner], reason, abs(time_diff))
+        return winner
+
+    def sync_item(self, item: SyncItem, current_audible_s: Optional[float], current_abs_s: Optional[float]):
+        """
+        Determines and returns (update_audible_to_s, update_abs_to_s).
+        Returns (None, None) if no update needed. All positions are in seconds.
+        """
+        asin = item.asin
+        status = self.sm.get_sync_status(asin)
+        # Monotonic so cooldowns and conflict timing survive wall-clock jumps
+        now = time.monotonic()
+
+        # Settings are read once per call
+        mode = settings.ONE_WAY_MODE
+        cooldown = settings.SYNC_COOLDOWN_SECONDS
+        if cooldown is None:
+            # Cycles start one interval apart, so a shorter cooldown would never apply
+            cooldown = settings.SYNC_INTERVAL_SECONDS * 1.5
+        conflict_min_delta = settings.SYNC_CONFLICT_MIN_TIME_DELTA_SECONDS
+
+        # Inputs
+        audible_pos_s = current_audible_s
+        abs_pos_s = current_abs_s
+
+        # 1. Detect Changes
+        audible_changed, abs_changed = self.detect_changes(item, status, audible_pos_s, abs_pos_s, now)
         if not audible_changed and not abs_changed:
             return None, None
 
+        # Anything past this point has modified the status
+        self.sm.mark_dirty()
+
         # 2. One-Way Sync checks
-        if settings.ONE_WAY_MODE == "audible_to_abs":
+        if mode == "audible_to_abs":
             if audible_changed and abs_pos_s is not None:
                 return None, audible_pos_s
             return None, None
-        elif settings.ONE_WAY_MODE == "abs_to_audible":
+        elif mode == "abs_to_audible":
             if abs_changed and audible_pos_s is not None:
-                return int(abs_pos_s * 1000), None
+                return abs_pos_s, None
             return None, None
 
-        # 3. Bidirectional Resolution
+        # 3. Bidirectional Resolution: look up the winning side, then push it to the other one
+        winner = RESOLUTION_TABLE[(audible_changed, abs_changed)]
+        if winner == CONFLICT:
+            logger.info("Conflict detected for %s. Audible: %ss, ABS: %ss", asin, audible_pos_s, abs_pos_s)
+            winner = self._resolve_conflict(asin, status, audible_pos_s, abs_pos_s, conflict_min_delta)
+
         target_audible = None
         target_abs = None
-
-        if audible_changed and not abs_changed:
-            # Audible moved, ABS didn't -> Push to ABS
-            if abs_pos_s is not None: # Only push if ABS knows about this item
-                target_abs = audible_pos_s
-        
-        elif abs_changed and not audible_changed:
-            # ABS moved, Audible didn't -> Push to Audible
-            if audible_pos_s is not None:
-                target_audible = int(abs_pos_s * 1000)
-        
-        elif audible_changed and abs_changed:
-            # Conflict! Both moved since last sync.
-            logger.info(f"Conflict detected for {asin}. Audible: {audible_pos_s}s, ABS: {abs_pos_s}s")
-            
-            # Timestamp strategy
-            ts_audible = status.last_change_detected_audible_at
-            ts_abs = status.last_change_detected_abs_at
-            
-            time_diff = ts_audible - ts_abs
-            
-            # If explicit timestamps differ significantly, trust the newer one
-            if abs(time_diff) >= settings.SYNC_CONFLICT_MIN_TIME_DELTA_SECONDS:
-                if time_diff > 0: # Audible is newer
-                    target_abs = audible_pos_s
-                    logger.info(f"Resolving conflict for {asin}: Audible is newer by {time_diff:.1f}s")
-                else: # ABS is newer
-                    target_audible = int(abs_pos_s * 1000)
-                    logger.info(f"Resolving conflict for {asin}: ABS is newer by {-time_diff:.1f}s")
-            else:
-                # Timestamps close. Check progress distance.
-                # Usually we want the furthest point (forward progress), 
-                # unless it's a huge jump which might be a legitimate seek/rewind.
-                # Since we don't track 'max_reached', we assume further is better.
-                if audible_pos_s > abs_pos_s:
-                    # Audible is further ahead
-                    # Check if it's not a crazy jump forward? No, usually forward is safe.
-                    target_abs = audible_pos_s
-                    logger.info(f"Resolving conflict for {asin}: Audible is further ahead")
-                else:
-                    target_audible = int(abs_pos_s * 1000)
-                    logger.info(f"Resolving conflict for {asin}: ABS is further ahead")
+        # Only push to a side that knows about this item
+        if winner == SIDE_AUDIBLE and abs_pos_s is not None:
+            target_abs = audible_pos_s
+        elif winner == SIDE_ABS and audible_pos_s is not None:
+            target_audible = abs_pos_s
 
         # 4. Cooldown & Safety Checks
         
         # Cooldown: Don't push to Audible if we just pushed recently
         if target_audible is not None:
-            logger.info(f"Preparing to push {target_audible/1000.0:.1f}s to Audible for {asin}")
-            if (now - status.last_pushed_to_audible_at) < settings.SYNC_COOLDOWN_SECONDS:
+            logger.debug("Preparing to push %.1fs to Audible for %s", target_audible, asin)
+            if (now - status.last_pushed_to_audible_at) < cooldown:
                 # Unless change is massive (e.g. > 5 min), skip
-                if abs(target_audible - status.last_seen_audible_position_ms) < 300000:
-                    logger.info(f"Skipping push to Audible for {asin} due to cooldown")
+                if abs(target_audible - status.last_seen_audible_position_s) < 300:
+                    logger.info("Skipping push to Audible for %s due to cooldown", asin)
                     target_audible = None
             else:
                 status.last_pushed_to_audible_at = now
 
         # Cooldown: Don't push to ABS if we just pushed recently
         if target_abs is not None:
-             logger.info(f"Preparing to push {target_abs:.1f}s to ABS for {asin}")
-             if (now - status.last_pushed_to_abs_at) < settings.SYNC_COOLDOWN_SECONDS:
+             logger.debug("Preparing to push %.1fs to ABS for %s", target_abs, asin)
+             if (now - status.last_pushed_to_abs_at) < cooldown:
                  if abs(target_abs - status.last_seen_abs_position_s) < 300:
-                    logger.info(f"Skipping push to ABS for {asin} due to cooldown")
+                    logger.info("Skipping push to ABS for %s due to cooldown", asin)
                     target_abs = None
              else:
                  status.last_pushed_to_abs_at = now
@@ -5,6 +5,13 @@ import sys
 import uvicorn
 import time
 from contextlib import asynccontextmanager
+from typing import Awaitable, Collection, Dict, List, Optional, Set, Tuple
+
+try:
+    # libuv-backed event loop; not available on Windows
+    import uvloop
+except ImportError:
+    uvloop = None
 
 from .config import settings
 from .state import StateManager
@@ -33,6 +40,8 @@ class SyncService:
         self.audible = AudibleClient()
         self.abs = ABSClient()
         self.engine = SyncEngine(self.state_manager)
+        # asin -> (position_ms, fetched_at monotonic)
+        self._audible_pos_cache: Dict[str, Tuple[int, float]] = {}
         
         # Link state manager to server module
         server.state_manager = self.state_manager
@@ -57,7 +66,7 @@ class SyncService:
                             self.state_manager.update_watchlist(items)
                             logger.info(f"Deep scan added {len(items)} items to watchlist")
                         self.state_manager.state.last_deep_scan = now
-                        self.state_manager.save()
+                        self.state_manager.mark_dirty()
 
                 # 2. Recent Purchases (medium slow)
                 if now - self.state_manager.state.last_library_discovery > settings.AUDIBLE_LIBRARY_DISCOVERY_INTERVAL_SECONDS:
@@ -68,98 +77,180 @@ class SyncService:
                         self.state_manager.update_watchlist(items)
                         logger.info(f"Added {len(items)} recent purchases to watchlist")
                     self.state_manager.state.last_library_discovery = now
-                    self.state_manager.save()
+                    self.state_manager.mark_dirty()
 
             except Exception as e:
                 logger.error(f"Error in discovery tasks: {e}", exc_info=True)
 
             await asyncio.sleep(60)
 
+    async def _gather_bounded(self, coros: List[Awaitable], return_exceptions: bool = False) -> list:
+        """Await coroutines concurrently, at most SYNC_MAX_CONCURRENCY at a time."""
+        sem = asyncio.Semaphore(settings.SYNC_MAX_CONCURRENCY)
+
+        async def _bounded(coro: Awaitable):
+            async with sem:
+                return await coro
+
+        return await asyncio.gather(*[_bounded(c) for c in coros], return_exceptions=return_exceptions)
+
+    async def _get_audible_positions(self, asins: Collection[str], always_fetch: Set[str]) -> Dict[str, int]:
+        """
+        Audible positions for asins, reusing values fetched within AUDIBLE_POSITION_CACHE_TTL_SECONDS.
+        ASINs in always_fetch (actively played) bypass the cache.
+        Only positions Audible actually returned are cached: a missing one may be a
+        failed batch, so it is fetched again next time. Entries for ASINs that are
+        no longer candidates are dropped.
+        """
+        cache = self._audible_pos_cache
+        for asin in [a for a in cache if a not in asins]:
+            del cache[asin]
+
+        now = time.monotonic()
+        ttl = settings.AUDIBLE_POSITION_CACHE_TTL_SECONDS
+        positions = {}
+        stale = []
+        for asin in asins:
+            cached = cache.get(asin)
+            if cached and asin not in always_fetch and now - cached[1] < ttl:
+                positions[asin] = cached[0]
+            else:
+                stale.append(asin)
+
+        if stale:
+            fetched = await self.audible.get_last_positions(stale)
+            for asin, position_ms in fetched.items():
+                cache[asin] = (position_ms, now)
+            positions.update(fetched)
+        return positions
+
+    async def _resolve_abs_items(self, asins: List[str]) -> Dict[str, SyncItem]:
+        """
+        Build SyncItems for ASINs missing from the ABS in-progress list.
+        Unknown ABS IDs are looked up in one concurrent batch, then progress for
+        every resolved item is fetched in a second one.
+        """
+        abs_ids = {}
+        unknown = []
+        for asin in asins:
+            abs_id = self.abs.asin_map.get(asin)
+            if abs_id:
+                abs_ids[asin] = abs_id
+            else:
+                unknown.append(asin)
+
+        if unknown:
+            found = await self._gather_bounded([self.abs.lookup_abs_item(asin) for asin in unknown])
+            for asin, abs_id in zip(unknown, found):
+                if abs_id:
+                    abs_ids[asin] = abs_id
+                # Otherwise we cannot sync to ABS without ID
+
+        progs = await self._gather_bounded([self.abs.get_item_progress(abs_id) for abs_id in abs_ids.values()])
+
+        items = {}
+        for (asin, abs_id), prog in zip(abs_ids.items(), progs):
+            if prog is None:
+                # ABS state unknown this cycle; a made-up 0s would look like a rewind
+                continue
+            abs_pos = 0.0
+            abs_updated = 0
+            if prog:
+                abs_pos = prog.get("currentTime", 0.0)
+                abs_updated = (prog.get("lastUpdate", 0) / 1000.0) if prog.get("lastUpdate") else 0
+            
+            items[asin] = SyncItem(
+                asin=asin, 
+                abs_item_id=abs_id, 
+                abs_pos_s=abs_pos,
+                abs_updated_at=abs_updated
+            )
+        return items
+
+    async def _process_candidate(self, item: SyncItem, audible_pos_ms: Optional[int]):
+        """Sync a single item between Audible and ABS."""
+        asin = item.asin
+
+        # Audible reports milliseconds; the engine works in seconds
+        audible_pos_s = audible_pos_ms / 1000.0 if audible_pos_ms is not None else None
+        
+        # Engine decisions are synchronous, so concurrent candidates never interleave
+        # their SyncStatus updates (each ASIN also has its own status entry).
+        target_audible, target_abs = self.engine.sync_item(
+            item, audible_pos_s, item.abs_pos_s
+        )
+        
+        # Apply Updates
+        # Post-sync state only reflects pushes that actually landed; otherwise the
+        # next loop would see the unchanged target as a change and push it back.
+        # Skipped pushes (None, e.g. dry run) are neither a success nor an error.
+        if target_audible is not None:
+            target_ms = int(round(target_audible * 1000))
+            applied = await self.audible.update_position(asin, target_ms)
+            if applied:
+                self._audible_pos_cache[asin] = (target_ms, time.monotonic())
+                self.engine.update_post_sync_state(asin, pushed_audible_s=target_audible)
+            elif applied is False:
+                self.engine.record_push_failure(asin)
+        
+        if target_abs is not None:
+            applied = await self.abs.update_progress(item.abs_item_id, target_abs)
+            if applied:
+                self.engine.update_post_sync_state(asin, pushed_abs_s=target_abs)
+            elif applied is False:
+                self.engine.record_push_failure(asin)
+
     async def sync_loop(self):
         while self.running:
-            start_time = time.time()
+            start_time = time.monotonic()
             try:
-                # 1. Build Candidate Set
+                # 1. Build Candidate Set (dict keys: ordered and deduplicated)
                 # Start with watchlist
-                candidates = set(self.state_manager.state.watchlist)
+                candidates = dict.fromkeys(self.state_manager.state.watchlist)
                 
                 # Add ABS in-progress
                 abs_items = await self.abs.get_in_progress()
-                for asin in abs_items.keys():
-                    candidates.add(asin)
+                candidates.update(dict.fromkeys(abs_items))
 
                 # Add Audible Recently Played (poll live activity)
                 recent_audible = await self.audible.get_recently_played(limit=settings.AUDIBLE_RECENTLY_PLAYED_LIMIT)
                 if recent_audible:
-                    for asin in recent_audible:
-                        candidates.add(asin)
+                    candidates.update(dict.fromkeys(recent_audible))
                     # Update watchlist to persist these active items
                     self.state_manager.update_watchlist(recent_audible)
 
-                candidate_list = list(candidates)
-                if not candidate_list:
+                if not candidates:
                     logger.debug("No candidates to sync.")
                 else:
-                    logger.info(f"Syncing {len(candidate_list)} candidates...")
+                    logger.info("Syncing %d candidates...", len(candidates))
                     
                     # Update Watchlist with active items to keep them fresh in LRU
-                    self.state_manager.update_watchlist(list(abs_items.keys()))
+                    self.state_manager.update_watchlist(abs_items)
 
                     # 2. Fetch Audible Data
-                    audible_positions = await self.audible.get_last_positions(candidate_list)
+                    audible_positions = await self._get_audible_positions(candidates, set(recent_audible))
+                    
+                    # 3. Fill in ABS data for candidates that aren't in progress on ABS
+                    items = dict(abs_items)
+                    items.update(await self._resolve_abs_items([a for a in candidates if a not in abs_items]))
                     
-                    # 3. Process Each Candidate
-                    for asin in candidate_list:
-                        # Construct SyncItem
-                        # We might have ABS data from the bulk fetch
-                        item = abs_items.get(asin)
-                        if not item:
-                            # Try to look it up if we don't know the ID
-                            abs_id = self.abs.asin_map.get(asin)
-                            if not abs_id:
-                                abs_id = await self.abs.lookup_abs_item(asin)
-                            
-                            if abs_id:
-                                # Fetch actual progress if possible
-                                prog = await self.abs.get_item_progress(abs_id)
-                                abs_pos = 0.0
-                                abs_updated = 0
-                                if prog:
-                                    abs_pos = prog.get("currentTime", 0.0)
-                                    abs_updated = (prog.get("lastUpdate", 0) / 1000.0) if prog.get("lastUpdate") else 0
-                                
-                                item = SyncItem(
-                                    asin=asin, 
-                                    abs_item_id=abs_id, 
-                                    abs_pos_s=abs_pos,
-                                    abs_updated_at=abs_updated
-                                )
-                            else:
-                                continue # Cannot sync to ABS without ID
-
-                        audible_pos = audible_positions.get(asin)
-                        
-                        target_audible, target_abs = self.engine.sync_item(
-                            item, audible_pos, item.abs_pos_s
-                        )
-                        
-                        # Apply Updates
-                        if target_audible is not None:
-                            await self.audible.update_position(asin, target_audible)
-                            self.engine.update_post_sync_state(asin, pushed_audible_ms=target_audible)
-                        
-                        if target_abs is not None:
-                            await self.abs.update_progress(item.abs_item_id, target_abs)
-                            self.engine.update_post_sync_state(asin, pushed_abs_s=target_abs)
+                    # 4. Process candidates concurrently, bounded to limit parallel HTTP requests
+                    results = await self._gather_bounded(
+                        [self._process_candidate(item, audible_positions.get(asin)) for asin, item in items.items()],
+                        return_exceptions=True
+                    )
+                    for asin, result in zip(items, results):
+                        if isinstance(result, Exception):
+                            logger.error("Error syncing %s: %s", asin, result, exc_info=result)
 
+                # Not worth a write on its own; persisted with the next change
                 self.state_manager.state.last_successful_sync = time.time()
-                self.state_manager.save()
 
             except Exception as e:
-                logger.error(f"Error in sync loop: {e}", exc_info=True)
+                logger.error("Error in sync loop: %s", e, exc_info=True)
 
             # Wait for remainder of interval
-            elapsed = time.time() - start_time
+            elapsed = time.monotonic() - start_time
             sleep_time = max(1, settings.SYNC_INTERVAL_SECONDS - elapsed)
             await asyncio.sleep(sleep_time)
 
@@ -168,7 +259,8 @@ class SyncService:
         
         tasks = [
             asyncio.create_task(self.sync_loop()),
-            asyncio.create_task(self.run_discovery_tasks())
+            asyncio.create_task(self.run_discovery_tasks()),
+            asyncio.create_task(self.state_manager.run_flush_loop())
         ]
         
         if settings.HTTP_SERVER_ENABLED:
@@ -181,7 +273,8 @@ class SyncService:
         except asyncio.CancelledError:
             pass
         finally:
-            self.state_manager.save()
+            self.state_manager.save(force=True)
+            self.abs.flush_item_cache()
 
 def handle_sigterm(sig, frame):
     logger.info("Received SIGTERM, shutting down...")
@@ -190,7 +283,8 @@ def handle_sigterm(sig, frame):
 if __name__ == "__main__":
     signal.signal(signal.SIGTERM, handle_sigterm)
     service = SyncService()
+    run = uvloop.run if uvloop else asyncio.run
     try:
-        asyncio.run(service.start())
+        run(service.start())
     except KeyboardInterrupt:
         logger.info("Interrupted by user")
@@ -1,7 +1,12 @@
-from pydantic import BaseModel, Field
+from collections import OrderedDict
+from dataclasses import dataclass
+from pydantic import BaseModel, Field, field_serializer, field_validator
 from typing import Dict, List, Optional, Set
 
-class SyncItem(BaseModel):
+# Hot per-item records are plain slotted dataclasses; pydantic still validates
+# and serializes them as part of SyncState.
+@dataclass(slots=True)
+class SyncItem:
     asin: str
     audible_pos_s: Optional[float] = None
     abs_pos_s: Optional[float] = None
@@ -12,20 +17,54 @@ class SyncItem(BaseModel):
     audible_updated_at: float = 0  # Timestamp when we detected/read the change
     abs_updated_at: float = 0      # Explicit lastUpdate from ABS or detection time
 
-class SyncStatus(BaseModel):
+@dataclass(slots=True)
+class SyncStatus:
     asin: str
-    last_seen_audible_position_ms: int = 0
+    last_seen_audible_position_s: float = 0.0
     last_seen_abs_position_s: float = 0.0
+    # Monotonic timestamps; only meaningful within a single process run
     last_change_detected_audible_at: float = 0.0
     last_change_detected_abs_at: float = 0.0
     last_pushed_to_audible_at: float = 0.0
     last_pushed_to_abs_at: float = 0.0
+    # Echo guard, armed by a push until the side confirms it: the value we pushed and
+    # the one it overwrote. A read of the overwritten value meanwhile is stale, not a change.
+    last_pushed_audible_position_s: Optional[float] = None
+    last_pushed_abs_position_s: Optional[float] = None
+    audible_position_before_push_s: Optional[float] = None
+    abs_position_before_push_s: Optional[float] = None
     last_sync_result: str = "ok"
     error_count: int = 0
 
 class SyncState(BaseModel):
-    watchlist: List[str] = Field(default_factory=list)  # Ordered by LRU (recent last)
+    # Ordered by LRU (recent last). Keys only; persisted as a plain list.
+    watchlist: "OrderedDict[str, None]" = Field(default_factory=OrderedDict)
     items: Dict[str, SyncStatus] = Field(default_factory=dict)
     last_library_discovery: float = 0.0
     last_deep_scan: float = 0.0
     last_successful_sync: float = 0.0
+
+    @field_validator("watchlist", mode="before")
+    @classmethod
+    def _watchlist_from_list(cls, value):
+        if isinstance(value, list):
+            return OrderedDict.fromkeys(value)
+        return value
+
+    @field_validator("items", mode="before")
+    @classmethod
+    def _migrate_audible_position_ms(cls, value):
+        # Older state files stored the Audible position in milliseconds
+        if not isinstance(value, dict):
+            return value
+        migrated = {}
+        for asin, data in value.items():
+            if isinstance(data, dict) and "last_seen_audible_position_ms" in data and "last_seen_audible_position_s" not in data:
+                data = dict(data)
+                data["last_seen_audible_position_s"] = data.pop("last_seen_audible_position_ms") / 1000.0
+            migrated[asin] = data
+        return migrated
+
+    @field_serializer("watchlist")
+    def _watchlist_to_list(self, value: "OrderedDict[str, None]") -> List[str]:
+        return list(value)
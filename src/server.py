@@ -1,11 +1,17 @@
-from fastapi import FastAPI, Depends, HTTPException, Header
-from typing import Optional
+import time
+import orjson
+from fastapi import FastAPI, Depends, HTTPException, Header, Response
+from typing import Optional, Tuple
 from .state import StateManager
 from .config import settings
+from .clients.throttle import TokenBucket
 
 app = FastAPI(title="Audible-ABS Sync")
 state_manager: Optional[StateManager] = None
 
+# (expires_at, body) for /metrics; the values only move once per sync cycle
+_metrics_cache: Tuple[float, bytes] = (float("-inf"), b"")
+
 def get_token(x_token: Optional[str] = Header(None, alias="X-Token")):
     if settings.HTTP_SERVER_TOKEN and x_token != settings.HTTP_SERVER_TOKEN:
         raise HTTPException(status_code=401, detail="Invalid token")
@@ -17,7 +23,6 @@ def healthz():
     
     last_sync = state_manager.state.last_successful_sync
     # Use a lenient threshold for health check (e.g. 3 missed intervals)
-    import time
     if time.time() - last_sync > (settings.SYNC_INTERVAL_SECONDS * 3 + 60):
         # We don't fail the container immediately, just report unhealthy
         # raise HTTPException(status_code=503, detail="Sync lagging")
@@ -30,7 +35,7 @@ def status():
     if not state_manager:
         return {"status": "not_ready"}
     
-    return {
+    body = {
         "watchlist_size": len(state_manager.state.watchlist),
         "total_tracked_items": len(state_manager.state.items),
         "last_sync": state_manager.state.last_successful_sync,
@@ -39,17 +44,27 @@ def status():
             "mode": settings.ONE_WAY_MODE
         }
     }
+    return Response(content=orjson.dumps(body), media_type="application/json")
 
 @app.get("/metrics")
 def metrics():
     # Simple prometheus-style text format
+    global _metrics_cache
     if not state_manager:
-        return ""
-    
+        return Response(content=b"", media_type="text/plain")
+
+    now = time.monotonic()
+    expires_at, body = _metrics_cache
+    if now < expires_at:
+        return Response(content=body, media_type="text/plain")
+
     s = state_manager.state
     lines = [
         f'audible_abs_watchlist_size {len(s.watchlist)}',
         f'audible_abs_last_sync_timestamp {s.last_successful_sync}',
-        f'audible_abs_items_tracked {len(s.items)}'
+        f'audible_abs_items_tracked {len(s.items)}',
+        f'audible_abs_throttle_waits_total {TokenBucket.waits_total}'
     ]
-    return "\n".join(lines)
+    body = ("\n".join(lines) + "\n").encode()
+    _metrics_cache = (now + max(1, settings.SYNC_INTERVAL_SECONDS / 10), body)
+    return Response(content=body, media_type="text/plain")
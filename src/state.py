@@ -1,11 +1,11 @@
-import json
 import logging
 import os
 import time
 import fcntl
 import asyncio
+import itertools
 from pathlib import Path
-from typing import Optional, List
+from typing import Iterable, Optional
 from .models import SyncState, SyncStatus
 from .config import settings
 
@@ -16,68 +16,151 @@ class StateManager:
         self.path = Path(path)
         self.state = SyncState()
         self.read_only = False
+        self._dirty = False
+        self._last_save_ts = float("-inf")  # monotonic
+        self._dirty_event = asyncio.Event()
+        self._last_written_hash: Optional[int] = None
+        self._tmp_counter = itertools.count()
         self._load()
 
+    @staticmethod
+    def _try_lock_shared(f) -> bool:
+        try:
+            fcntl.flock(f, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
     def _load(self):
         if not self.path.exists():
             logger.info(f"No state file found at {self.path}, creating new.")
             return
 
         try:
-            with open(self.path, 'r') as f:
-                data = json.load(f)
-                self.state = SyncState(**data)
+            with open(self.path, 'rb') as f:
+                # Shared lock lets other readers coexist; retry once if someone holds it exclusively.
+                # Writers replace the file atomically, so reading without the lock is still safe.
+                locked = self._try_lock_shared(f)
+                if not locked:
+                    time.sleep(0.1)
+                    locked = self._try_lock_shared(f)
+                    if not locked:
+                        logger.warning(f"State file {self.path} is locked by another process, reading anyway")
+                try:
+                    self.state = SyncState.model_validate_json(f.read())
+                finally:
+                    if locked:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+
+            # Monotonic timestamps from a previous run are meaningless now
+            for status in self.state.items.values():
+                status.last_change_detected_audible_at = 0.0
+                status.last_change_detected_abs_at = 0.0
+                status.last_pushed_to_audible_at = 0.0
+                status.last_pushed_to_abs_at = 0.0
         except Exception as e:
             logger.error(f"Failed to load state: {e}. Starting fresh.", exc_info=True)
 
-    def save(self):
+    @staticmethod
+    def _fsync_dir(path: Path):
+        # Best effort: some filesystems don't support fsync on directories
+        try:
+            dir_fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
+
+    def mark_dirty(self):
+        """Flag state as changed; the flush loop persists it."""
+        self._dirty = True
+        self._dirty_event.set()
+
+    async def run_flush_loop(self):
+        """Persist changes in the background, at most once per SAVE_MIN_INTERVAL_SECONDS."""
+        while True:
+            await self._dirty_event.wait()
+            self._dirty_event.clear()
+            wait = settings.SAVE_MIN_INTERVAL_SECONDS - (time.monotonic() - self._last_save_ts)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.save()
+
+    def save(self, force: bool = False):
+        """
+        Write state to disk if it changed and the last save is older than
+        SAVE_MIN_INTERVAL_SECONDS. force=True writes unconditionally (e.g. on shutdown).
+        """
         if not settings.PERSIST_ENABLED or self.read_only:
             return
+        if not force and (not self._dirty or time.monotonic() - self._last_save_ts < settings.SAVE_MIN_INTERVAL_SECONDS):
+            return
 
-        tmp_path = self.path.with_suffix('.tmp')
+        # Serialized by pydantic-core straight from the model, without an intermediate dict
+        buf = self.state.model_dump_json().encode()
+        buf_hash = hash(buf)
+        if buf_hash == self._last_written_hash:
+            # Nothing changed on disk; skip the write and fsync
+            self._dirty = False
+            return
+
+        # Unique per process and call, so concurrent writers never share a temp file
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{next(self._tmp_counter)}.tmp")
         try:
-            # Atomic write pattern with locking
-            with open(tmp_path, 'w') as f:
-                # Try to acquire lock
-                try:
-                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
-                except BlockingIOError:
-                    logger.warning("Could not acquire lock for state save. Skipping save cycle.")
-                    return
-                
-                try:
-                    json.dump(self.state.model_dump(), f, indent=2)
-                    f.flush()
-                    os.fsync(f.fileno())
-                finally:
-                    fcntl.flock(f, fcntl.LOCK_UN)
+            # Atomic write pattern: write + fsync a temp file, then replace.
+            # Raw fd I/O: the buffer is already complete, so one write() covers it.
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                view = memoryview(buf)
+                while view:
+                    view = view[os.write(fd, view):]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
             
-            # Atomic rename
-            os.rename(tmp_path, self.path)
+            # Atomic rename, made durable by syncing the directory entry
+            os.replace(tmp_path, self.path)
+            self._fsync_dir(self.path.parent)
+            self._dirty = False
+            self._last_save_ts = time.monotonic()
+            self._last_written_hash = buf_hash
             
         except OSError as e:
+            try:
+                tmp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
             logger.error(f"Failed to save state to {self.path}: {e}")
             # If we can't write, switch to read-only to be safe for this run
             self.read_only = True 
 
-    def update_watchlist(self, asins: List[str]):
+    def update_watchlist(self, asins: Iterable[str]):
         """Update watchlist maintaining LRU order and max size."""
-        current = set(self.state.watchlist)
-        new_items = [a for a in asins if a not in current]
-        
-        # Remove existing if present to move to end (most recently used)
+        watchlist = self.state.watchlist
+        size_before = len(watchlist)
         for asin in asins:
-            if asin in current:
-                self.state.watchlist.remove(asin)
-        
-        # Append to end
-        self.state.watchlist.extend(asins)
+            # Move existing to end (most recently used), or append
+            if asin in watchlist:
+                watchlist.move_to_end(asin)
+            else:
+                watchlist[asin] = None
         
         # Trim from beginning
-        if len(self.state.watchlist) > settings.WATCHLIST_MAX_SIZE:
-            self.state.watchlist = self.state.watchlist[-settings.WATCHLIST_MAX_SIZE:]
+        trimmed = False
+        while len(watchlist) > settings.WATCHLIST_MAX_SIZE:
+            watchlist.popitem(last=False)
+            trimmed = True
+
+        # Reordering alone is persisted with the next real change
+        if trimmed or len(watchlist) != size_before:
+            self.mark_dirty()
 
     def get_sync_status(self, asin: str) -> SyncStatus:
         if asin not in self.state.items:
             self.state.items[asin] = SyncStatus(asin=asin)
+            self.mark_dirty()
         return self.state.items[asin]
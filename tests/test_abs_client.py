@@ -0,0 +1,125 @@
+import asyncio
+import unittest
+import httpx
+from src.clients.abs_client import ABSClient, _ME_DECODER
+from src.config import settings
+
+class ABSClientTestCase(unittest.TestCase):
+    def setUp(self):
+        settings.PERSIST_ENABLED = False
+        self.abs = ABSClient()
+        self.requests = []
+
+    def run_with(self, handler, func):
+        """Run func() against a mock ABS server; every request is recorded."""
+        def recording_handler(request):
+            self.requests.append(request)
+            return handler(request)
+
+        async def run():
+            self.abs.client = httpx.AsyncClient(base_url="http://abs", transport=httpx.MockTransport(recording_handler))
+            async with self.abs.client:
+                return await func()
+        return asyncio.run(run())
+
+class TestABSItemMappings(ABSClientTestCase):
+    def setUp(self):
+        super().setUp()
+        self.abs.asin_map = {"A1": "I1"}
+        self.abs.item_map = {"I1": "A1"}
+
+    def get_progress(self, item_id="I1", item_exists=True):
+        def handler(request):
+            if request.url.path == f"/api/items/{item_id}" and item_exists:
+                return httpx.Response(200, json={"id": item_id})
+            return httpx.Response(404)
+        return self.run_with(handler, lambda: self.abs.get_item_progress(item_id))
+
+    def test_no_progress_keeps_mapping(self):
+        self.assertEqual(self.get_progress(item_exists=True), {})
+        self.assertEqual(self.abs.asin_map, {"A1": "I1"})
+
+    def test_existence_checked_once(self):
+        self.get_progress(item_exists=True)
+        self.get_progress(item_exists=True)
+        item_gets = [r for r in self.requests if r.url.path == "/api/items/I1"]
+        self.assertEqual(len(item_gets), 1)
+
+    def test_deleted_item_drops_mapping(self):
+        self.assertIsNone(self.get_progress(item_exists=False))
+        self.assertEqual(self.abs.asin_map, {})
+        self.assertEqual(self.abs.item_map, {})
+
+    def test_deleted_item_drops_search_mapping(self):
+        # Mappings from library search only exist in asin_map
+        self.abs.asin_map["B1"] = "I9"
+        self.assertIsNone(self.get_progress(item_id="I9", item_exists=False))
+        self.assertEqual(self.abs.asin_map, {"A1": "I1"})
+
+class TestInProgressLookup(ABSClientTestCase):
+    ME = {"id": "u1", "mediaProgress": [
+        {"libraryItemId": "I1", "currentTime": 10},
+        {"libraryItemId": "I2", "currentTime": 20},
+        {"libraryItemId": "I3", "currentTime": 30},
+    ]}
+    ITEMS = {
+        "I1": {"id": "I1", "media": {"metadata": {"asin": "A1"}}},
+        "I2": {"id": "I2", "media": {"metadata": {}}},
+        "I3": {"id": "I3", "media": {"metadata": {"asin": "A3"}}},
+    }
+
+    def get_in_progress(self, batch_response):
+        def handler(request):
+            path = request.url.path
+            if path == "/api/me":
+                return httpx.Response(200, json=self.ME)
+            if path == "/api/items/batch/get":
+                return batch_response
+            item_id = path.rsplit("/", 1)[-1]
+            if path.startswith("/api/items/") and item_id in self.ITEMS:
+                return httpx.Response(200, json=self.ITEMS[item_id])
+            return httpx.Response(404)
+        return self.run_with(handler, self.abs.get_in_progress)
+
+    def item_gets(self):
+        return sorted(r.url.path for r in self.requests if r.method == "GET" and r.url.path.startswith("/api/items/"))
+
+    def test_batch_resolves_returned_items(self):
+        # The batch omits I3, which falls back to a per-item lookup
+        batch = httpx.Response(200, json={"libraryItems": [self.ITEMS["I1"], self.ITEMS["I2"]]})
+        results = self.get_in_progress(batch)
+        self.assertEqual(sorted(results), ["A1", "A3"])
+        self.assertEqual(results["A3"].abs_item_id, "I3")
+        self.assertEqual(self.item_gets(), ["/api/items/I3"])
+
+    def test_batch_failure_falls_back_per_item(self):
+        results = self.get_in_progress(httpx.Response(404))
+        self.assertEqual(sorted(results), ["A1", "A3"])
+        self.assertEqual(self.item_gets(), ["/api/items/I1", "/api/items/I2", "/api/items/I3"])
+
+    def test_item_without_asin_cached_as_miss(self):
+        batch = httpx.Response(200, json={"libraryItems": list(self.ITEMS.values())})
+        self.get_in_progress(batch)
+        self.assertIn("I2", self.abs._no_asin_ids)
+        self.assertEqual(self.abs.item_map, {"I1": "A1", "I3": "A3"})
+
+class TestConditionalGet(ABSClientTestCase):
+    def test_304_reuses_decoded_body(self):
+        def handler(request):
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json={"id": "u1"}, headers={"ETag": '"v1"'})
+
+        async def fetch_twice():
+            first = await self.abs._conditional_get("/api/me", _ME_DECODER)
+            second = await self.abs._conditional_get("/api/me", _ME_DECODER)
+            return first, second
+
+        first, second = self.run_with(handler, fetch_twice)
+        self.assertNotIn("If-None-Match", self.requests[0].headers)
+        self.assertEqual(self.requests[1].headers["If-None-Match"], '"v1"')
+        self.assertEqual(first.id, "u1")
+        self.assertIs(second, first)
+
+if __name__ == '__main__':
+    unittest.main()
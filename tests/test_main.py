@@ -0,0 +1,84 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from src.config import settings
+from src.main import SyncService
+from src.models import SyncItem
+
+class FakeAudible:
+    def __init__(self, responses):
+        self.responses = responses
+        self.requested = []
+
+    async def get_last_positions(self, asins):
+        self.requested.append(list(asins))
+        return self.responses.pop(0)
+
+    async def update_position(self, asin, position_ms):
+        return self.responses.pop(0)
+
+class TestAudiblePositionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        settings.STATE_PATH = str(Path(self.tmp.name) / "state.json")
+        settings.PERSIST_ENABLED = False
+        settings.AUDIBLE_POSITION_CACHE_TTL_SECONDS = 600
+        self.svc = SyncService()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def positions(self, asins):
+        return asyncio.run(self.svc._get_audible_positions(dict.fromkeys(asins), set()))
+
+    def test_failed_fetch_not_cached(self):
+        self.svc.audible = FakeAudible([{}, {"A1": 5000}])
+        # A failed batch comes back empty; the next cycle must ask again
+        self.assertEqual(self.positions(["A1"]), {})
+        self.assertEqual(self.positions(["A1"]), {"A1": 5000})
+
+    def test_cached_position_reused(self):
+        self.svc.audible = FakeAudible([{"A1": 5000}])
+        self.positions(["A1"])
+        self.assertEqual(self.positions(["A1"]), {"A1": 5000})
+        self.assertEqual(self.svc.audible.requested, [["A1"]])
+
+    def test_non_candidates_pruned(self):
+        self.svc.audible = FakeAudible([{"A1": 5000}, {"B1": 7000}])
+        self.positions(["A1"])
+        self.positions(["B1"])
+        self.assertEqual(list(self.svc._audible_pos_cache), ["B1"])
+
+class TestProcessCandidate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        settings.STATE_PATH = str(Path(self.tmp.name) / "state.json")
+        settings.PERSIST_ENABLED = False
+        settings.SYNC_TOLERANCE_SECONDS = 5
+        settings.ONE_WAY_MODE = "bidirectional"
+        self.svc = SyncService()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def push_abs_change(self, result):
+        # ABS moved to 500s while Audible stayed at 0, so 500s is pushed to Audible
+        self.svc.audible = FakeAudible([result])
+        item = SyncItem(asin="A1", abs_item_id="I1", abs_pos_s=500)
+        asyncio.run(self.svc._process_candidate(item, 0))
+        return self.svc.state_manager.get_sync_status("A1")
+
+    def test_skipped_push_is_not_an_error(self):
+        status = self.push_abs_change(None)
+        self.assertEqual(status.error_count, 0)
+        self.assertEqual(status.last_sync_result, "ok")
+        self.assertEqual(status.last_seen_audible_position_s, 0)
+
+    def test_failed_push_recorded(self):
+        status = self.push_abs_change(False)
+        self.assertEqual(status.error_count, 1)
+        self.assertEqual(status.last_sync_result, "error")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+import httpx
+from src.clients.retry import call_with_retries
+from src.config import settings
+
+def _status_error(code, headers=None):
+    request = httpx.Request("PATCH", "http://abs/api/me/progress/1")
+    response = httpx.Response(code, headers=headers, request=request)
+    return httpx.HTTPStatusError(f"{code}", request=request, response=response)
+
+class TestCallWithRetries(unittest.TestCase):
+    def setUp(self):
+        settings.RETRY_MAX_ATTEMPTS = 3
+
+    def run_with_failures(self, failures):
+        calls = []
+
+        async def func():
+            calls.append(1)
+            if failures:
+                raise failures.pop(0)
+            return "ok"
+
+        with patch("src.clients.retry.asyncio.sleep", new=AsyncMock()) as sleep:
+            try:
+                result = asyncio.run(call_with_retries(func))
+            except Exception as e:
+                result = e
+        return result, len(calls), sleep
+
+    def test_retries_server_errors(self):
+        result, calls, sleep = self.run_with_failures([_status_error(502), httpx.ConnectError("down")])
+        self.assertEqual(result, "ok")
+        self.assertEqual(calls, 3)
+        self.assertEqual(sleep.await_count, 2)
+
+    def test_client_error_not_retried(self):
+        result, calls, _ = self.run_with_failures([_status_error(404)])
+        self.assertIsInstance(result, httpx.HTTPStatusError)
+        self.assertEqual(calls, 1)
+
+    def test_gives_up_after_max_attempts(self):
+        result, calls, _ = self.run_with_failures([_status_error(503)] * 5)
+        self.assertIsInstance(result, httpx.HTTPStatusError)
+        self.assertEqual(calls, 3)
+
+    def test_honors_retry_after(self):
+        result, _, sleep = self.run_with_failures([_status_error(429, {"Retry-After": "7"})])
+        self.assertEqual(result, "ok")
+        sleep.assert_awaited_once_with(7.0)
+
+if __name__ == '__main__':
+    unittest.main()
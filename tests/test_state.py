@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from src.state import StateManager
+from src.config import settings
+
+class TestStateManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "state.json"
+        self.sm = StateManager(str(self.path))
+        settings.WATCHLIST_MAX_SIZE = 500
+        settings.PERSIST_ENABLED = True
+        settings.SAVE_MIN_INTERVAL_SECONDS = 60
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_watchlist_lru_order(self):
+        self.sm.update_watchlist(["a", "b", "c"])
+        self.sm.update_watchlist(["a"])
+        self.assertEqual(list(self.sm.state.watchlist), ["b", "c", "a"])
+
+    def test_watchlist_trims_oldest(self):
+        settings.WATCHLIST_MAX_SIZE = 3
+        self.sm.update_watchlist(["a", "b", "c"])
+        self.sm.update_watchlist(["d", "b"])
+        self.assertEqual(list(self.sm.state.watchlist), ["c", "d", "b"])
+
+    def test_watchlist_duplicates_in_one_update(self):
+        settings.WATCHLIST_MAX_SIZE = 3
+        self.sm.update_watchlist(["a", "b"])
+        self.sm.update_watchlist(["c", "a", "c", "d"])
+        # Each ASIN appears once, ordered by its last occurrence
+        self.assertEqual(list(self.sm.state.watchlist), ["a", "c", "d"])
+
+    def test_watchlist_persisted_as_list(self):
+        self.sm.update_watchlist(["a", "b"])
+        self.sm.save()
+        self.assertEqual(json.loads(self.path.read_text())["watchlist"], ["a", "b"])
+
+        reloaded = StateManager(str(self.path))
+        self.assertEqual(list(reloaded.state.watchlist), ["a", "b"])
+
+    def test_save_skipped_when_clean_or_recent(self):
+        self.sm.save()
+        self.assertFalse(self.path.exists())
+
+        self.sm.update_watchlist(["a"])
+        self.sm.save()
+        self.assertTrue(self.path.exists())
+
+        # Within SAVE_MIN_INTERVAL_SECONDS of the last write
+        self.sm.update_watchlist(["b"])
+        self.sm.save()
+        self.assertEqual(json.loads(self.path.read_text())["watchlist"], ["a"])
+
+        self.sm.save(force=True)
+        self.assertEqual(json.loads(self.path.read_text())["watchlist"], ["a", "b"])
+
+    def test_unchanged_state_not_rewritten(self):
+        self.sm.update_watchlist(["a"])
+        with patch("src.state.os.replace", wraps=os.replace) as replace:
+            self.sm.save(force=True)
+            self.sm.save(force=True)
+        self.assertEqual(replace.call_count, 1)
+        self.assertEqual([p.name for p in self.path.parent.iterdir()], ["state.json"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 import time
-from src.models import SyncItem, SyncStatus
+from src.models import SyncItem, SyncState, SyncStatus
 from src.state import StateManager
 from src.engine import SyncEngine
 from src.config import settings
@@ -12,6 +12,8 @@ class MockStateManager:
         if asin not in self.items:
             self.items[asin] = SyncStatus(asin=asin)
         return self.items[asin]
+    def mark_dirty(self):
+        pass
 
 class TestSyncEngine(unittest.TestCase):
     def setUp(self):
@@ -21,46 +23,159 @@ class TestSyncEngine(unittest.TestCase):
         settings.SYNC_TOLERANCE_SECONDS = 5
         settings.SYNC_CONFLICT_MIN_TIME_DELTA_SECONDS = 30
         settings.ONE_WAY_MODE = "bidirectional"
+        settings.SYNC_COOLDOWN_SECONDS = None
 
     def test_no_change(self):
         item = SyncItem(asin="test", abs_pos_s=100)
         status = self.sm.get_sync_status("test")
-        status.last_seen_audible_position_ms = 100000
+        status.last_seen_audible_position_s = 100
         status.last_seen_abs_position_s = 100
         
-        aud_up, abs_up = self.engine.sync_item(item, 100000, 100)
+        aud_up, abs_up = self.engine.sync_item(item, 100.0, 100)
         self.assertIsNone(aud_up)
         self.assertIsNone(abs_up)
 
     def test_audible_moves_forward(self):
         item = SyncItem(asin="test", abs_pos_s=100)
         status = self.sm.get_sync_status("test")
-        status.last_seen_audible_position_ms = 100000 # 100s
+        status.last_seen_audible_position_s = 100
         status.last_seen_abs_position_s = 100
         
         # Audible moves to 200s
-        aud_up, abs_up = self.engine.sync_item(item, 200000, 100)
+        aud_up, abs_up = self.engine.sync_item(item, 200.0, 100)
         self.assertIsNone(aud_up)
         self.assertEqual(abs_up, 200.0)
 
     def test_conflict_audible_newer(self):
         item = SyncItem(asin="test", abs_pos_s=150) # Moved to 150s
         status = self.sm.get_sync_status("test")
-        status.last_seen_audible_position_ms = 100000 # Was 100s
+        status.last_seen_audible_position_s = 100 # Was 100s
         status.last_seen_abs_position_s = 100
         
-        now = time.time()
+        now = time.monotonic()
         # Audible changed recently
         status.last_change_detected_audible_at = now
         # ABS changed long ago (simulation)
         status.last_change_detected_abs_at = now - 100 
         
         # Audible moves to 200s
-        aud_up, abs_up = self.engine.sync_item(item, 200000, 150)
+        aud_up, abs_up = self.engine.sync_item(item, 200.0, 150)
         
         # Audible timestamp is newer -> Audible wins, push 200s to ABS
         self.assertIsNone(aud_up)
         self.assertEqual(abs_up, 200.0)
 
+    def test_conflict_uses_abs_wall_clock_update(self):
+        # ABS reports it was updated 100s ago (wall clock)
+        item = SyncItem(asin="test", abs_pos_s=300, abs_updated_at=time.time() - 100)
+        status = self.sm.get_sync_status("test")
+        status.last_seen_audible_position_s = 100
+        status.last_seen_abs_position_s = 100
+
+        # Both moved; Audible change is detected now, so it is newer
+        aud_up, abs_up = self.engine.sync_item(item, 200.0, 300)
+        self.assertIsNone(aud_up)
+        self.assertEqual(abs_up, 200.0)
+
+    def test_conflict_close_timestamps_furthest_wins(self):
+        item = SyncItem(asin="test", abs_pos_s=400)
+        status = self.sm.get_sync_status("test")
+        status.last_seen_audible_position_s = 100
+        status.last_seen_abs_position_s = 100
+
+        # Both changes detected in the same pass; ABS is further ahead
+        aud_up, abs_up = self.engine.sync_item(item, 200.0, 400)
+        self.assertEqual(aud_up, 400)
+        self.assertIsNone(abs_up)
+
+    def test_abs_moves_forward(self):
+        item = SyncItem(asin="test", abs_pos_s=250)
+        status = self.sm.get_sync_status("test")
+        status.last_seen_audible_position_s = 100
+        status.last_seen_abs_position_s = 100
+
+        # ABS moves to 250s, pushed to Audible in seconds
+        aud_up, abs_up = self.engine.sync_item(item, 100.0, 250)
+        self.assertEqual(aud_up, 250.0)
+        self.assertIsNone(abs_up)
+
+    def push_abs_to_audible(self):
+        status = self.sm.get_sync_status("test")
+        status.last_seen_audible_position_s = 100
+        status.last_seen_abs_position_s = 100
+        # ABS moves to 500s, pushed to Audible
+        aud_up, _ = self.engine.sync_item(SyncItem(asin="test", abs_pos_s=500), 100.0, 500)
+        self.assertEqual(aud_up, 500)
+        self.engine.update_post_sync_state("test", pushed_audible_s=aud_up)
+        return status
+
+    def test_stale_read_after_push_ignored(self):
+        status = self.push_abs_to_audible()
+        item = SyncItem(asin="test", abs_pos_s=500)
+
+        # Audible still reports the pre-push 100s; not a change to push over ABS
+        self.assertEqual(self.engine.sync_item(item, 100.0, 500), (None, None))
+        self.assertEqual(status.last_seen_audible_position_s, 500)
+
+        # Once Audible shows our value the guard is disarmed
+        self.assertEqual(self.engine.sync_item(item, 500.0, 500), (None, None))
+        self.assertIsNone(status.last_pushed_audible_position_s)
+
+    def test_change_while_guard_armed_synced(self):
+        self.push_abs_to_audible()
+        # Audible moved on from our push before we read it back
+        aud_up, abs_up = self.engine.sync_item(SyncItem(asin="test", abs_pos_s=500), 800.0, 500)
+        self.assertIsNone(aud_up)
+        self.assertEqual(abs_up, 800.0)
+
+    def test_stale_guard_expires(self):
+        status = self.push_abs_to_audible()
+        status.last_pushed_to_audible_at -= settings.SYNC_INTERVAL_SECONDS * 10
+        # Long after the push, going back to 100s is taken as a real rewind
+        aud_up, abs_up = self.engine.sync_item(SyncItem(asin="test", abs_pos_s=500), 100.0, 500)
+        self.assertIsNone(aud_up)
+        self.assertEqual(abs_up, 100.0)
+
+    def test_cooldown_skips_small_push_next_cycle(self):
+        status = self.push_abs_to_audible()
+        # One cycle later ABS has moved another 60s; still within the cooldown
+        aud_up, abs_up = self.engine.sync_item(SyncItem(asin="test", abs_pos_s=560), 500.0, 560)
+        self.assertIsNone(aud_up)
+        self.assertIsNone(abs_up)
+
+        # Past the cooldown it is pushed
+        status.last_pushed_to_audible_at -= settings.SYNC_INTERVAL_SECONDS * 2
+        aud_up, _ = self.engine.sync_item(SyncItem(asin="test", abs_pos_s=620), 500.0, 620)
+        self.assertEqual(aud_up, 620)
+
+    def test_seek_back_to_pushed_position_synced(self):
+        # Audible moves to 1000s, pushed to ABS
+        _, abs_up = self.engine.sync_item(SyncItem(asin="test", abs_pos_s=0), 1000.0, 0)
+        self.assertEqual(abs_up, 1000.0)
+        self.engine.update_post_sync_state("test", pushed_abs_s=abs_up)
+
+        # Listening continues on ABS to 2000s, pushed to Audible
+        aud_up, _ = self.engine.sync_item(SyncItem(asin="test", abs_pos_s=2000), 1000.0, 2000)
+        self.assertEqual(aud_up, 2000)
+        self.engine.update_post_sync_state("test", pushed_audible_s=aud_up)
+
+        # Seeking back on ABS near the earlier pushed value is a real change
+        aud_up, abs_up = self.engine.sync_item(SyncItem(asin="test", abs_pos_s=1002), 2000.0, 1002)
+        self.assertEqual(aud_up, 1002)
+        self.assertIsNone(abs_up)
+
+    def test_push_failure_keeps_last_seen(self):
+        status = self.sm.get_sync_status("test")
+        status.last_seen_abs_position_s = 100
+
+        self.engine.record_push_failure("test")
+        self.assertEqual(status.last_seen_abs_position_s, 100)
+        self.assertEqual(status.last_sync_result, "error")
+        self.assertEqual(status.error_count, 1)
+
+    def test_legacy_ms_position_migrated(self):
+        state = SyncState.model_validate({"items": {"test": {"asin": "test", "last_seen_audible_position_ms": 123456}}})
+        self.assertEqual(state.items["test"].last_seen_audible_position_s, 123.456)
+
 if __name__ == '__main__':
     unittest.main()
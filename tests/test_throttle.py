@@ -0,0 +1,34 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+from src.clients.throttle import TokenBucket
+
+class TestTokenBucket(unittest.TestCase):
+    def acquire_n(self, bucket, n):
+        async def run():
+            for _ in range(n):
+                await bucket.acquire()
+
+        with patch("src.clients.throttle.asyncio.sleep", new=AsyncMock()) as sleep:
+            asyncio.run(run())
+        return sleep
+
+    def test_burst_does_not_wait(self):
+        before = TokenBucket.waits_total
+        sleep = self.acquire_n(TokenBucket(rate_per_sec=1.0, burst=3), 3)
+        self.assertEqual(sleep.await_count, 0)
+        self.assertEqual(TokenBucket.waits_total, before)
+
+    def test_waits_once_burst_is_spent(self):
+        before = TokenBucket.waits_total
+        sleep = self.acquire_n(TokenBucket(rate_per_sec=2.0, burst=1), 2)
+        self.assertEqual(sleep.await_count, 1)
+        self.assertAlmostEqual(sleep.await_args.args[0], 0.5, places=2)
+        self.assertEqual(TokenBucket.waits_total, before + 1)
+
+    def test_zero_rate_disables_throttling(self):
+        sleep = self.acquire_n(TokenBucket(rate_per_sec=0, burst=1), 5)
+        self.assertEqual(sleep.await_count, 0)
+
+if __name__ == '__main__':
+    unittest.main()